@@ -1,4 +1,5 @@
 import logging
+import os
 import signal
 from contextlib import contextmanager
 from typing import Any, Iterator, Optional, Sequence
@@ -131,28 +132,41 @@ def subscriptions_executor(
         f"subscriptions_stale_threshold_sec_{dataset_name}", stale_threshold_seconds
     )
 
-    processor = build_executor_consumer(
-        dataset_name,
-        entity_names,
-        consumer_group,
-        producer,
-        total_concurrent_queries,
-        auto_offset_reset,
-        not no_strict_offset_reset,
-        metrics,
-        stale_threshold_seconds,
-        cooperative_rebalancing,
-    )
+    # The consumer subscribes as soon as it is built. Hold off any shutdown
+    # signal until the handlers are installed so it triggers a clean shutdown
+    # (leaving the consumer group) rather than killing the process mid setup.
+    # The tradeoff is that building the consumer talks to Kafka (fetching the
+    # partition count, creating the consumer), and signals stay pending until
+    # that returns or raises. The mask is always restored, and a signal that
+    # arrived meanwhile is delivered as soon as it is.
+    shutdown_signals = {signal.SIGINT, signal.SIGTERM}
+    signal.pthread_sigmask(signal.SIG_BLOCK, shutdown_signals)
+    try:
+        processor = build_executor_consumer(
+            dataset_name,
+            entity_names,
+            consumer_group,
+            producer,
+            total_concurrent_queries,
+            auto_offset_reset,
+            not no_strict_offset_reset,
+            metrics,
+            stale_threshold_seconds,
+            cooperative_rebalancing,
+        )
 
-    def handler(signum: int, frame: Any) -> None:
-        # TODO: Temporary code for debugging executor shutdown
-        logger = logging.getLogger()
-        logger.setLevel(logging.DEBUG)
+        def handler(signum: int, frame: Any) -> None:
+            # TODO: Temporary code for debugging executor shutdown. Logging every
+            # debug record slows down the shutdown itself so it is opt-in.
+            if os.environ.get("SNUBA_DEBUG_SHUTDOWN"):
+                logging.getLogger().setLevel(logging.DEBUG)
 
-        processor.signal_shutdown()
+            processor.signal_shutdown()
 
-    signal.signal(signal.SIGINT, handler)
-    signal.signal(signal.SIGTERM, handler)
+        signal.signal(signal.SIGINT, handler)
+        signal.signal(signal.SIGTERM, handler)
+    finally:
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, shutdown_signals)
 
     with closing(producer), flush_querylog(), flush_attribution_producer():
         processor.run()
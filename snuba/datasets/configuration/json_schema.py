@@ -42,13 +42,18 @@ NULLABLE_DISALLOWED_AGGREGATIONS_SCHEMA = {
 def make_column_schema(
     column_type: dict[str, Any], args: dict[str, Any]
 ) -> dict[str, Any]:
-    args["properties"]["schema_modifiers"] = TYPE_STRING_ARRAY
     return {
         "type": "object",
         "properties": {
             "name": TYPE_STRING,
             "type": column_type,
-            "args": args,
+            "args": {
+                **args,
+                "properties": {
+                    **args["properties"],
+                    "schema_modifiers": TYPE_STRING_ARRAY,
+                },
+            },
         },
         "additionalProperties": False,
     }
@@ -110,6 +115,32 @@ AGGREGATE_FUNCTION_SCHEMA = make_column_schema(
     },
 )
 
+
+def make_column_dispatch_schema(column_schemas: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Validates a column only against the column schema matching its type,
+    instead of trying every column schema in turn as anyOf would. This also
+    makes errors point at the actual problem with the column.
+    """
+    column_types: list[str] = []
+    for column_schema in column_schemas:
+        column_type = column_schema["properties"]["type"]
+        column_types.extend(column_type.get("enum", [column_type.get("const")]))
+
+    return {
+        "type": "object",
+        "properties": {"type": {"enum": column_types}},
+        "required": ["type"],
+        "allOf": [
+            {
+                "if": {"properties": {"type": column_schema["properties"]["type"]}},
+                "then": column_schema,
+            }
+            for column_schema in column_schemas
+        ],
+    }
+
+
 COLUMN_TYPES = [
     NUMBER_SCHEMA,
     NO_ARG_SCHEMA,
@@ -122,13 +153,19 @@ NESTED_SCHEMA = make_column_schema(
     args={
         "type": "object",
         "properties": {
-            "subcolumns": {"type": "array", "items": {"anyOf": COLUMN_TYPES}}
+            "subcolumns": {
+                "type": "array",
+                "items": make_column_dispatch_schema(COLUMN_TYPES),
+            }
         },
         "additionalProperties": False,
     },
 )
 
-SCHEMA_COLUMNS = {"type": "array", "items": {"anyOf": [*COLUMN_TYPES, NESTED_SCHEMA]}}
+SCHEMA_COLUMNS = {
+    "type": "array",
+    "items": make_column_dispatch_schema([*COLUMN_TYPES, NESTED_SCHEMA]),
+}
 
 SCHEMA_SCHEMA = {
     "type": "object",
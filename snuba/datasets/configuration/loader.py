@@ -1,10 +1,44 @@
 from __future__ import annotations
 
-from typing import Any, Mapping
+from typing import Any, Mapping, MutableMapping, Tuple
 
-from jsonschema import validate
+import jsonschema
 from yaml import safe_load
 
+# Keyed by the id of the schema object. The schema itself is kept alongside
+# the validator so the id can't be recycled by another object.
+_VALIDATORS: MutableMapping[int, Tuple[Mapping[str, Any], Any]] = {}
+
+
+def _get_validator(schema: Mapping[str, Any]) -> Any:
+    """
+    Returns a validator for the given schema, checking the schema against
+    its metaschema only the first time it is seen. ``jsonschema.validate``
+    does both on every call, which dominates the cost of loading the
+    configuration files since they all share a handful of schemas.
+    """
+    cached = _VALIDATORS.get(id(schema))
+    if cached is not None and cached[0] is schema:
+        return cached[1]
+
+    cls = jsonschema.validators.validator_for(schema)
+    cls.check_schema(schema)
+    validator = cls(schema)
+    _VALIDATORS[id(schema)] = (schema, validator)
+    return validator
+
+
+def validate_configuration_data(
+    config: Mapping[str, Any], schema: Mapping[str, Any]
+) -> None:
+    """
+    Equivalent to ``jsonschema.validate`` but reuses the validator built
+    for the schema. Raises ``jsonschema.ValidationError``.
+    """
+    error = jsonschema.exceptions.best_match(_get_validator(schema).iter_errors(config))
+    if error is not None:
+        raise error
+
 
 def load_configuration_data(
     path: str, validation_schemas: Mapping[str, Any]
@@ -16,5 +50,5 @@ def load_configuration_data(
     file = open(path)
     config = safe_load(file)
     assert isinstance(config, dict)
-    validate(config, validation_schemas[config["kind"]])
+    validate_configuration_data(config, validation_schemas[config["kind"]])
     return config
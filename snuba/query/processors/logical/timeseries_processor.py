@@ -194,6 +194,7 @@ class TimeSeriesProcessor(QueryProcessor):
 GRANULARITY_MAPPING = {
     "toStartOfMinute": 60,
     "toStartOfHour": 3600,
+    "toStartOfDay": 86400,
     "toDate": 86400,
 }
 
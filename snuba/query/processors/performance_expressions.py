@@ -9,28 +9,32 @@ from snuba.query.processors.logical.custom_function import (
 from snuba.query.validation.signature import Column as ColType
 from snuba.query.validation.signature import Literal as LiteralType
 
+_FAILURE_RATE_BINDINGS = tuple(
+    (code, SPAN_STATUS_NAME_TO_CODE[code]) for code in ("ok", "cancelled", "unknown")
+)
+
+# The processors are instantiated every time the query processors of an entity
+# are requested, which happens for each query. Expressions are immutable, so
+# parse the function bodies once and share them.
+_APDEX_BODY = simple_function(
+    "divide(plus(countIf(lessOrEquals(column, satisfied)), divide(countIf(and(greater(column, satisfied), lessOrEquals(column, multiply(satisfied, 4)))), 2)), count())"
+)
+
+_FAILURE_RATE_BODY = partial_function(
+    # We use and(notEquals...) here instead of in(tuple(...)) because it's possible to get an impossible query that sets transaction_status to NULL.
+    # Clickhouse returns an error if an expression such as NULL in (0, 1, 2) appears.
+    "divide(countIf(and(notEquals(transaction_status, ok), and(notEquals(transaction_status, cancelled), notEquals(transaction_status, unknown)))), count())",
+    _FAILURE_RATE_BINDINGS,
+)
+
 
 def apdex_processor() -> CustomFunction:
     return CustomFunction(
         "apdex",
         [("column", ColType({UInt})), ("satisfied", LiteralType({int}))],
-        simple_function(
-            "divide(plus(countIf(lessOrEquals(column, satisfied)), divide(countIf(and(greater(column, satisfied), lessOrEquals(column, multiply(satisfied, 4)))), 2)), count())"
-        ),
+        _APDEX_BODY,
     )
 
 
 def failure_rate_processor() -> CustomFunction:
-    return CustomFunction(
-        "failure_rate",
-        [],
-        partial_function(
-            # We use and(notEquals...) here instead of in(tuple(...)) because it's possible to get an impossible query that sets transaction_status to NULL.
-            # Clickhouse returns an error if an expression such as NULL in (0, 1, 2) appears.
-            "divide(countIf(and(notEquals(transaction_status, ok), and(notEquals(transaction_status, cancelled), notEquals(transaction_status, unknown)))), count())",
-            [
-                (code, SPAN_STATUS_NAME_TO_CODE[code])
-                for code in ("ok", "cancelled", "unknown")
-            ],
-        ),
-    )
+    return CustomFunction("failure_rate", [], _FAILURE_RATE_BODY)
@@ -46,6 +46,10 @@ logger = logging.getLogger(__name__)
 
 COMMIT_FREQUENCY_SEC = 1
 
+# How long ExecuteQuery.join waits before resubmitting a result the next step
+# rejected, so it does not spin while the producer drains its buffer.
+JOIN_RETRY_BACKOFF_SEC = 0.1
+
 
 def calculate_max_concurrent_queries(
     assigned_partition_count: int,
@@ -84,9 +88,9 @@ def build_executor_consumer(
 ) -> StreamProcessor[KafkaPayload]:
     # Validate that a valid dataset/entity pair was passed in
     dataset = get_dataset(dataset_name)
-    dataset_entity_names = [
+    dataset_entity_names = {
         get_entity_name(e).value for e in dataset.get_all_entities()
-    ]
+    }
 
     # Only entities in the same dataset with the same scheduled and result topics
     # may be run together
@@ -291,21 +295,29 @@ class ExecuteQuery(ProcessingStrategy[KafkaPayload]):
 
     def poll(self) -> None:
         while self.__queue:
-            if not self.__queue[0][1].future.done():
-                break
+            message, result_future = self.__queue[0]
 
-            message, result_future = self.__queue.popleft()
+            if not result_future.future.done():
+                break
 
-            self.__next_step.submit(
-                Message(
-                    message.partition,
-                    message.offset,
-                    SubscriptionTaskResult(
-                        result_future.task, result_future.future.result()
-                    ),
-                    message.timestamp,
+            # If the next step is full, keep the result at the head of the
+            # queue and retry once it has drained some of its buffer. Our own
+            # queue filling up will then apply backpressure to the consumer.
+            try:
+                self.__next_step.submit(
+                    Message(
+                        message.partition,
+                        message.offset,
+                        SubscriptionTaskResult(
+                            result_future.task, result_future.future.result()
+                        ),
+                        message.timestamp,
+                    )
                 )
-            )
+            except MessageRejected:
+                break
+
+            self.__queue.popleft()
 
         self.__next_step.poll()
 
@@ -377,20 +389,34 @@ class ExecuteQuery(ProcessingStrategy[KafkaPayload]):
                 logger.warning(f"Timed out with {len(self.__queue)} futures in queue")
                 break
 
-            message, result_future = self.__queue.popleft()
+            message, result_future = self.__queue[0]
 
             subscription_task_result = SubscriptionTaskResult(
                 result_future.task, result_future.future.result(remaining)
             )
 
-            self.__next_step.submit(
-                Message(
-                    message.partition,
-                    message.offset,
-                    subscription_task_result,
-                    message.timestamp,
+            # As in poll, keep the result at the head of the queue until the
+            # next step has accepted it, giving it a chance to drain its
+            # buffer before retrying.
+            try:
+                self.__next_step.submit(
+                    Message(
+                        message.partition,
+                        message.offset,
+                        subscription_task_result,
+                        message.timestamp,
+                    )
                 )
-            )
+            except MessageRejected:
+                self.__next_step.poll()
+                time.sleep(
+                    min(JOIN_RETRY_BACKOFF_SEC, remaining)
+                    if remaining is not None
+                    else JOIN_RETRY_BACKOFF_SEC
+                )
+                continue
+
+            self.__queue.popleft()
 
         remaining = timeout - (time.time() - start) if timeout is not None else None
         self.__executor.shutdown()
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Callable
+from typing import Any, Callable
 
 import pytest
 from arroyo.processing.strategies.dead_letter_queue import (
@@ -11,6 +11,10 @@ from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from snuba.datasets.configuration.json_schema import V1_READABLE_STORAGE_SCHEMA
+from snuba.datasets.configuration.loader import (
+    _get_validator,
+    validate_configuration_data,
+)
 from snuba.datasets.configuration.storage_builder import build_stream_loader
 from snuba.datasets.configuration.utils import generate_policy_creator
 from snuba.datasets.generic_metrics_processor import GenericSetsMetricsProcessor
@@ -135,3 +139,98 @@ def test_missing_required_key() -> None:
     with pytest.raises(ValidationError) as e:
         validate(config, V1_READABLE_STORAGE_SCHEMA)
     assert e.value.message == "'kind' is a required property"
+
+
+def test_validate_configuration_data_reuses_validator() -> None:
+    config = {
+        "version": "v1",
+        "kind": "readable_storage",
+        "name": "",
+        "storage": {"key": "x", "set_key": "x"},
+        "schema": {"columns": []},
+        "query_processors": [],
+    }
+    validate_configuration_data(config, V1_READABLE_STORAGE_SCHEMA)
+    validator = _get_validator(V1_READABLE_STORAGE_SCHEMA)
+    validate_configuration_data(config, V1_READABLE_STORAGE_SCHEMA)
+    assert _get_validator(V1_READABLE_STORAGE_SCHEMA) is validator
+
+
+def test_validate_configuration_data_matches_validate() -> None:
+    config = {
+        "version": "v1",
+        "kind": "readable_storage",
+        "name": "",
+        "storage": {"key": 1, "set_key": "x"},
+        "schema": {"columns": []},
+        "query_processors": [],
+    }
+    with pytest.raises(ValidationError) as expected:
+        validate(config, V1_READABLE_STORAGE_SCHEMA)
+    with pytest.raises(ValidationError) as e:
+        validate_configuration_data(config, V1_READABLE_STORAGE_SCHEMA)
+    assert e.value.message == expected.value.message == "1 is not of type 'string'"
+
+
+@pytest.mark.parametrize(
+    "columns, message",
+    [
+        pytest.param(
+            [{"name": "a", "type": "Bogus", "args": {}}],
+            "'Bogus' is not one of ['UInt', 'Float', 'String', 'DateTime', 'Array', 'AggregateFunction', 'Nested']",
+            id="unknown type",
+        ),
+        pytest.param(
+            [{"name": "a", "args": {}}],
+            "'type' is a required property",
+            id="missing type",
+        ),
+        pytest.param(
+            [{"name": "a", "type": "UInt", "args": {"size": "64"}}],
+            "'64' is not of type 'number'",
+            id="wrong arg type",
+        ),
+        pytest.param(
+            [
+                {
+                    "name": "n",
+                    "type": "Nested",
+                    "args": {
+                        "subcolumns": [
+                            {"name": "m", "type": "Nested", "args": {"subcolumns": []}}
+                        ]
+                    },
+                }
+            ],
+            "'Nested' is not one of ['UInt', 'Float', 'String', 'DateTime', 'Array', 'AggregateFunction']",
+            id="nested subcolumn",
+        ),
+        pytest.param(
+            [
+                {
+                    "name": "n",
+                    "type": "Nested",
+                    "args": {
+                        "subcolumns": [
+                            {"name": "a", "type": "UInt", "args": {"size": "64"}}
+                        ]
+                    },
+                }
+            ],
+            "'64' is not of type 'number'",
+            id="wrong subcolumn arg type",
+        ),
+    ],
+)
+def test_invalid_column(columns: list[dict[str, Any]], message: str) -> None:
+    config = {
+        "version": "v1",
+        "kind": "readable_storage",
+        "name": "",
+        "storage": {"key": "x", "set_key": "x"},
+        "schema": {"columns": columns},
+        "query_processors": [],
+    }
+    with pytest.raises(ValidationError) as e:
+        validate(config, V1_READABLE_STORAGE_SCHEMA)
+    assert e.value.message == message
@@ -20,6 +20,8 @@ from snuba.reader import Reader
 from snuba.request import Request
 from snuba.web import QueryResult
 
+_QUANTILES = tuple(Literal(None, quant) for quant in [0.5, 0.75, 0.9, 0.95, 0.99, 1])
+
 
 def test_sessions_processing() -> None:
     query_body = {
@@ -48,9 +50,6 @@ def test_sessions_processing() -> None:
     def query_runner(
         query: Query, settings: QuerySettings, reader: Reader
     ) -> QueryResult:
-        quantiles = tuple(
-            Literal(None, quant) for quant in [0.5, 0.75, 0.9, 0.95, 0.99, 1]
-        )
         assert query.get_selected_columns() == [
             SelectedExpression(
                 "duration_quantiles",
@@ -59,7 +58,7 @@ def test_sessions_processing() -> None:
                     FunctionCall(
                         None,
                         "quantilesIfMerge",
-                        quantiles,
+                        _QUANTILES,
                     ),
                     (Column(None, None, "duration_quantiles"),),
                 ),
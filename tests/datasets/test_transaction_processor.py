@@ -1,15 +1,51 @@
+import time
 import uuid
-from copy import deepcopy
-from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
+from dataclasses import dataclass, replace
+from datetime import datetime
 from typing import Any, Mapping, Optional, Sequence, Tuple
 
+import pytest
+
 from snuba import settings
 from snuba.consumers.types import KafkaMessageMetadata
 from snuba.datasets.transactions_processor import TransactionsMessageProcessor
 from snuba.processor import InsertBatch
 from snuba.state import set_config
 
+# Span groups derived from the span hashes in the serialized event
+_SPAN_A = int("a" * 16, 16)
+_SPAN_B = int("b" * 16, 16)
+
+_META = KafkaMessageMetadata(offset=1, partition=2, timestamp=datetime(1970, 1, 1))
+
+# Parts of the payload that do not depend on the event. The processor only reads
+# them so they are shared by every serialized payload.
+_BREADCRUMBS = {
+    "values": [
+        {
+            "category": "query",
+            "timestamp": 1565308204.544,
+            "message": "[Filtered]",
+            "type": "default",
+            "level": "info",
+        },
+    ],
+}
+_MEASUREMENTS = {
+    "lcp": {"value": 32.129},
+    "lcp.elementSize": {"value": 4242},
+    "fid": {"value": None},
+    "invalid": None,
+    "invalid2": {},
+}
+_BREAKDOWNS = {
+    "span_ops": {
+        "ops.db": {"value": 62.512},
+        "ops.http": {"value": 109.774},
+        "total.time": {"value": 172.286},
+    }
+}
+
 
 @dataclass
 class TransactionEvent:
@@ -68,17 +104,7 @@ class TransactionEvent:
                         "name": self.sdk_name,
                         "packages": [{"version": "0.9.0", "name": "pypi:sentry-sdk"}],
                     },
-                    "breadcrumbs": {
-                        "values": [
-                            {
-                                "category": "query",
-                                "timestamp": 1565308204.544,
-                                "message": "[Filtered]",
-                                "type": "default",
-                                "level": "info",
-                            },
-                        ],
-                    },
+                    "breadcrumbs": _BREADCRUMBS,
                     "spans": [
                         {
                             "sampled": True,
@@ -109,20 +135,8 @@ class TransactionEvent:
                     "datetime": "2019-08-08T22:29:53.917000Z",
                     "timestamp": self.timestamp,
                     "start_timestamp": self.start_timestamp,
-                    "measurements": {
-                        "lcp": {"value": 32.129},
-                        "lcp.elementSize": {"value": 4242},
-                        "fid": {"value": None},
-                        "invalid": None,
-                        "invalid2": {},
-                    },
-                    "breakdowns": {
-                        "span_ops": {
-                            "ops.db": {"value": 62.512},
-                            "ops.http": {"value": 109.774},
-                            "total.time": {"value": 172.286},
-                        }
-                    },
+                    "measurements": _MEASUREMENTS,
+                    "breakdowns": _BREAKDOWNS,
                     "contexts": {
                         "trace": {
                             "sampled": True,
@@ -171,9 +185,7 @@ class TransactionEvent:
         start_timestamp = datetime.utcfromtimestamp(self.start_timestamp)
         finish_timestamp = datetime.utcfromtimestamp(self.timestamp)
 
-        spans = sorted(
-            [(self.op, int("a" * 16, 16), 1.2345), ("http", int("b" * 16, 16), 0.1234)]
-        )
+        spans = sorted([(self.op, _SPAN_A, 1.2345), ("http", _SPAN_B, 0.1234)])
 
         ret = {
             "deleted": 0,
@@ -245,228 +257,126 @@ class TransactionEvent:
         return ret
 
 
+@pytest.fixture
+def timestamps() -> Tuple[float, float]:
+    timestamp = time.time() - 5
+    return (timestamp - 5, timestamp)
+
+
+@pytest.fixture
+def base_event(timestamps: Tuple[float, float]) -> TransactionEvent:
+    start, finish = timestamps
+    return TransactionEvent(
+        event_id="e5e062bf2e1d4afd96fd2f90b6770431",
+        trace_id="7400045b25c443b885914600aa83ad04",
+        span_id="8841662216cc598b",
+        group_ids=[100, 200],
+        transaction_name="/organizations/:orgId/issues/",
+        status="cancelled",
+        op="navigation",
+        timestamp=finish,
+        start_timestamp=start,
+        platform="python",
+        dist="",
+        user_name="me",
+        user_id="myself",
+        user_email="me@myself.com",
+        ipv4="127.0.0.1",
+        ipv6=None,
+        environment="prod",
+        release="34a554c14b68285d8a8eb6c5c4c56dfc1db9a83a",
+        sdk_name="sentry.python",
+        sdk_version="0.9.0",
+        http_method="POST",
+        http_referer="tagstore.something",
+        geo={"country_code": "XY", "region": "fake_region", "city": "fake_city"},
+        transaction_source="url",
+    )
+
+
+@pytest.fixture
+def base_result(base_event: TransactionEvent) -> Mapping[str, Any]:
+    return base_event.build_result(_META)
+
+
 class TestTransactionsProcessor:
-    def __get_timestamps(self) -> Tuple[float, float]:
-        timestamp = datetime.now(tz=timezone.utc) - timedelta(seconds=5)
-        start_timestamp = timestamp - timedelta(seconds=5)
-        return (start_timestamp.timestamp(), timestamp.timestamp())
-
-    def test_skip_non_transactions(self) -> None:
-        start, finish = self.__get_timestamps()
-        message = TransactionEvent(
-            event_id="e5e062bf2e1d4afd96fd2f90b6770431",
-            trace_id="7400045b25c443b885914600aa83ad04",
-            span_id="8841662216cc598b",
-            group_ids=[100, 200],
-            transaction_name="/organizations/:orgId/issues/",
-            status="cancelled",
-            op="navigation",
-            timestamp=finish,
-            start_timestamp=start,
-            platform="python",
-            dist="",
-            user_name="me",
-            user_id="myself",
-            user_email="me@myself.com",
-            ipv4="127.0.0.1",
-            ipv6=None,
-            environment="prod",
-            release="34a554c14b68285d8a8eb6c5c4c56dfc1db9a83a",
-            sdk_name="sentry.python",
-            sdk_version="0.9.0",
-            http_method="POST",
-            http_referer="tagstore.something",
-            geo={"country_code": "XY", "region": "fake_region", "city": "fake_city"},
-            transaction_source="url",
-        )
-        payload = message.serialize()
+    def test_skip_non_transactions(self, base_event: TransactionEvent) -> None:
+        payload = base_event.serialize()
         # Force an invalid event
         payload[2]["data"]["type"] = "error"
 
-        meta = KafkaMessageMetadata(
-            offset=1, partition=2, timestamp=datetime(1970, 1, 1)
-        )
         processor = TransactionsMessageProcessor()
-        assert processor.process_message(payload, meta) is None
-
-    def test_missing_trace_context(self) -> None:
-        start, finish = self.__get_timestamps()
-        message = TransactionEvent(
-            event_id="e5e062bf2e1d4afd96fd2f90b6770431",
-            trace_id="7400045b25c443b885914600aa83ad04",
-            span_id="8841662216cc598b",
-            group_ids=[100, 200],
-            transaction_name="/organizations/:orgId/issues/",
-            status="cancelled",
-            op="navigation",
-            timestamp=finish,
-            start_timestamp=start,
-            platform="python",
-            dist="",
-            user_name="me",
-            user_id="myself",
-            user_email="me@myself.com",
-            ipv4="127.0.0.1",
-            ipv6=None,
-            environment="prod",
-            release="34a554c14b68285d8a8eb6c5c4c56dfc1db9a83a",
-            sdk_name="sentry.python",
-            sdk_version="0.9.0",
-            http_method="POST",
-            http_referer="tagstore.something",
-            geo={"country_code": "XY", "region": "fake_region", "city": "fake_city"},
-            transaction_source="url",
-        )
-        payload = message.serialize()
+        assert processor.process_message(payload, _META) is None
+
+    def test_missing_trace_context(self, base_event: TransactionEvent) -> None:
+        payload = base_event.serialize()
         # Force an invalid event
         del payload[2]["data"]["contexts"]
 
-        meta = KafkaMessageMetadata(
-            offset=1, partition=2, timestamp=datetime(1970, 1, 1)
-        )
         processor = TransactionsMessageProcessor()
-        assert processor.process_message(payload, meta) is None
-
-    def test_base_process(self) -> None:
-        old_skip_context = settings.TRANSACT_SKIP_CONTEXT_STORE
-        settings.TRANSACT_SKIP_CONTEXT_STORE = {1: {"experiments"}}
-
-        start, finish = self.__get_timestamps()
-        message = TransactionEvent(
-            event_id="e5e062bf2e1d4afd96fd2f90b6770431",
-            trace_id="7400045b25c443b885914600aa83ad04",
-            span_id="8841662216cc598b",
-            group_ids=[100, 200],
-            transaction_name="/organizations/:orgId/issues/",
-            status="cancelled",
-            op="navigation",
-            timestamp=finish,
-            start_timestamp=start,
-            platform="python",
-            dist="",
-            user_name="me",
-            user_id="myself",
-            user_email="me@myself.com",
-            ipv4="127.0.0.1",
-            ipv6=None,
-            environment="prod",
-            release="34a554c14b68285d8a8eb6c5c4c56dfc1db9a83a",
-            sdk_name="sentry.python",
-            sdk_version="0.9.0",
-            http_method="POST",
-            http_referer="tagstore.something",
-            geo={"country_code": "XY", "region": "fake_region", "city": "fake_city"},
-            transaction_source="url",
-        )
-        meta = KafkaMessageMetadata(
-            offset=1, partition=2, timestamp=datetime(1970, 1, 1)
+        assert processor.process_message(payload, _META) is None
+
+    def test_base_process(
+        self,
+        base_event: TransactionEvent,
+        base_result: Mapping[str, Any],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(
+            settings, "TRANSACT_SKIP_CONTEXT_STORE", {1: {"experiments"}}
         )
-        assert TransactionsMessageProcessor().process_message(
-            message.serialize(), meta
-        ) == InsertBatch([message.build_result(meta)], None)
-        settings.TRANSACT_SKIP_CONTEXT_STORE = old_skip_context
 
-    def test_too_many_spans(self) -> None:
-        old_skip_context = settings.TRANSACT_SKIP_CONTEXT_STORE
-        settings.TRANSACT_SKIP_CONTEXT_STORE = {1: {"experiments"}}
-        set_config("max_spans_per_transaction", 1)
+        assert TransactionsMessageProcessor().process_message(
+            base_event.serialize(), _META
+        ) == InsertBatch([base_result], None)
 
-        start, finish = self.__get_timestamps()
-        message = TransactionEvent(
-            event_id="e5e062bf2e1d4afd96fd2f90b6770431",
-            trace_id="7400045b25c443b885914600aa83ad04",
-            span_id="8841662216cc598b",
-            group_ids=[100, 200],
-            transaction_name="/organizations/:orgId/issues/",
-            status="cancelled",
-            op="navigation",
-            timestamp=finish,
-            start_timestamp=start,
-            platform="python",
-            dist="",
-            user_name="me",
-            user_id="myself",
-            user_email="me@myself.com",
-            ipv4="127.0.0.1",
-            ipv6=None,
-            environment="prod",
-            release="34a554c14b68285d8a8eb6c5c4c56dfc1db9a83a",
-            sdk_name="sentry.python",
-            sdk_version="0.9.0",
-            http_method="POST",
-            http_referer="tagstore.something",
-            geo={"country_code": "XY", "region": "fake_region", "city": "fake_city"},
-            transaction_source="url",
-        )
-        meta = KafkaMessageMetadata(
-            offset=1, partition=2, timestamp=datetime(1970, 1, 1)
+    def test_too_many_spans(
+        self,
+        base_event: TransactionEvent,
+        base_result: Mapping[str, Any],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(
+            settings, "TRANSACT_SKIP_CONTEXT_STORE", {1: {"experiments"}}
         )
+        # Runtime config lives in redis, which is flushed after every test.
+        set_config("max_spans_per_transaction", 1)
 
-        payload = message.serialize()
+        payload = base_event.serialize()
 
         # there are 2 spans in the transaction but only 1
         # will be inserted because of the limit set above
-        result = message.build_result(meta)
-        result["spans.op"] = ["navigation"]
-        result["spans.group"] = [int("a" * 16, 16)]
-        result["spans.exclusive_time"] = [0]
-        result["spans.exclusive_time_32"] = [1.2345]
+        result = {
+            **base_result,
+            "spans.op": ["navigation"],
+            "spans.group": [_SPAN_A],
+            "spans.exclusive_time": [0],
+            "spans.exclusive_time_32": [1.2345],
+        }
 
         assert TransactionsMessageProcessor().process_message(
-            payload, meta
+            payload, _META
         ) == InsertBatch([result], None)
-        settings.TRANSACT_SKIP_CONTEXT_STORE = old_skip_context
-
-    def test_missing_transaction_source(self) -> None:
-        start, finish = self.__get_timestamps()
-        message = TransactionEvent(
-            event_id="e5e062bf2e1d4afd96fd2f90b6770431",
-            trace_id="7400045b25c443b885914600aa83ad04",
-            span_id="8841662216cc598b",
-            group_ids=[100, 200],
-            transaction_name="/organizations/:orgId/issues/",
-            status="cancelled",
-            op="navigation",
-            timestamp=finish,
-            start_timestamp=start,
-            platform="python",
-            dist="",
-            user_name="me",
-            user_id="myself",
-            user_email="me@myself.com",
-            ipv4="127.0.0.1",
-            ipv6=None,
-            environment="prod",
-            release="34a554c14b68285d8a8eb6c5c4c56dfc1db9a83a",
-            sdk_name="sentry.python",
-            sdk_version="0.9.0",
-            http_method="POST",
-            http_referer="tagstore.something",
-            geo={"country_code": "XY", "region": "fake_region", "city": "fake_city"},
-            transaction_source="",
-        )
 
-        payload_base = message.serialize()
-        payload_wo_transaction_info = deepcopy(payload_base)
-        payload_wo_source = deepcopy(payload_base)
+    def test_missing_transaction_source(self, base_event: TransactionEvent) -> None:
+        message = replace(base_event, transaction_source="")
+
+        # serialize() builds a new payload on every call so each one can be
+        # mutated independently.
+        payload_wo_transaction_info = message.serialize()
+        payload_wo_source = message.serialize()
         # Remove transaction_info
         del payload_wo_transaction_info[2]["data"]["transaction_info"]
 
-        meta = KafkaMessageMetadata(
-            offset=1, partition=2, timestamp=datetime(1970, 1, 1)
-        )
         actual_message = TransactionsMessageProcessor().process_message(
-            payload_wo_transaction_info, meta
+            payload_wo_transaction_info, _META
         )
         assert actual_message.rows[0]["transaction_source"] == ""
 
         # Remove transaction_info.source
         del payload_wo_source[2]["data"]["transaction_info"]["source"]
 
-        meta = KafkaMessageMetadata(
-            offset=1, partition=2, timestamp=datetime(1970, 1, 1)
-        )
         actual_message = TransactionsMessageProcessor().process_message(
-            payload_wo_source, meta
+            payload_wo_source, _META
         )
         assert actual_message.rows[0]["transaction_source"] == ""
@@ -15,7 +15,7 @@ from snuba.query.conditions import (
 from snuba.query.data_source.simple import Entity as QueryEntity
 from snuba.query.dsl import multiply
 from snuba.query.exceptions import InvalidQueryException
-from snuba.query.expressions import Column, FunctionCall, Literal
+from snuba.query.expressions import Column, Expression, FunctionCall, Literal
 from snuba.query.logical import Query
 from snuba.query.processors.logical.timeseries_processor import (
     TimeSeriesProcessor,
@@ -24,28 +24,59 @@ from snuba.query.processors.logical.timeseries_processor import (
 from snuba.query.query_settings import HTTPQuerySettings
 from snuba.util import parse_datetime
 
-tests = [
-    pytest.param(
-        3600,
-        binary_condition(
-            ConditionFunctions.EQ,
-            Column("my_time", None, "time"),
-            Literal(None, "2020-01-01"),
-        ),
-        FunctionCall(
-            "my_time",
-            "toStartOfHour",
-            (Column(None, None, "finish_ts"), Literal(None, "Universal")),
-        ),
-        binary_condition(
-            ConditionFunctions.EQ,
+# Expressions are immutable so the same instances can be shared across cases.
+_FINISH_TS = Column(None, None, "finish_ts")
+_UNIVERSAL = Literal(None, "Universal")
+_TIME_COL = Column("my_time", None, "time")
+_DUR_COL = Column("transaction.duration", None, "duration")
+_DATE_LIT = Literal(None, "2020-01-01")
+_DATE_PARSED_LIT = Literal(None, parse_datetime("2020-01-01"))
+
+
+def _time_fn(function_name: str) -> FunctionCall:
+    return FunctionCall("my_time", function_name, (_FINISH_TS, _UNIVERSAL))
+
+
+def _eq_time() -> FunctionCall:
+    return binary_condition(ConditionFunctions.EQ, _TIME_COL, _DATE_LIT)
+
+
+def _eq_time_fn(function_name: str) -> FunctionCall:
+    return binary_condition(
+        ConditionFunctions.EQ, _time_fn(function_name), _DATE_PARSED_LIT
+    )
+
+
+_TIME_FN_1440 = FunctionCall(
+    "my_time",
+    "toDateTime",
+    (
+        multiply(
             FunctionCall(
-                "my_time",
-                "toStartOfHour",
-                (Column(None, None, "finish_ts"), Literal(None, "Universal")),
+                None,
+                "intDiv",
+                (
+                    FunctionCall(
+                        None,
+                        "toUInt32",
+                        (_FINISH_TS,),
+                    ),
+                    Literal(None, 1440),
+                ),
             ),
-            Literal(None, parse_datetime("2020-01-01")),
+            Literal(None, 1440),
         ),
+        _UNIVERSAL,
+    ),
+)
+
+
+tests = [
+    pytest.param(
+        3600,
+        _eq_time(),
+        _time_fn("toStartOfHour"),
+        _eq_time_fn("toStartOfHour"),
         "(toStartOfHour(finish_ts, 'Universal') AS my_time)",
         "equals((toStartOfHour(finish_ts, 'Universal') AS my_time), toDateTime('2020-01-01T00:00:00', 'Universal'))",
         id="granularity-3600-simple-condition",
@@ -54,33 +85,17 @@ tests = [
         60,
         binary_condition(
             BooleanFunctions.AND,
-            binary_condition(
-                ConditionFunctions.EQ,
-                Column("my_time", None, "time"),
-                Literal(None, "2020-01-01"),
-            ),
+            _eq_time(),
             binary_condition(
                 ConditionFunctions.EQ,
                 Column(None, None, "transaction"),
                 Literal(None, "something"),
             ),
         ),
-        FunctionCall(
-            "my_time",
-            "toStartOfMinute",
-            (Column(None, None, "finish_ts"), Literal(None, "Universal")),
-        ),
+        _time_fn("toStartOfMinute"),
         binary_condition(
             BooleanFunctions.AND,
-            binary_condition(
-                ConditionFunctions.EQ,
-                FunctionCall(
-                    "my_time",
-                    "toStartOfMinute",
-                    (Column(None, None, "finish_ts"), Literal(None, "Universal")),
-                ),
-                Literal(None, parse_datetime("2020-01-01")),
-            ),
+            _eq_time_fn("toStartOfMinute"),
             binary_condition(
                 ConditionFunctions.EQ,
                 Column(None, None, "transaction"),
@@ -98,11 +113,7 @@ tests = [
             FunctionCall(None, "toStartOfDay", (Column("my_time", None, "finish_ts"),)),
             Literal(None, "2020-01-01T01:01:01.000000Z"),
         ),
-        FunctionCall(
-            "my_time",
-            "toStartOfHour",
-            (Column(None, None, "finish_ts"), Literal(None, "Universal")),
-        ),
+        _time_fn("toStartOfHour"),
         binary_condition(
             ConditionFunctions.GTE,
             FunctionCall(
@@ -119,11 +130,7 @@ tests = [
     pytest.param(
         86400,
         None,
-        FunctionCall(
-            "my_time",
-            "toDate",
-            (Column(None, None, "finish_ts"), Literal(None, "Universal")),
-        ),
+        _time_fn("toDate"),
         None,
         "(toDate(finish_ts, 'Universal') AS my_time)",
         "",
@@ -132,28 +139,7 @@ tests = [
     pytest.param(
         1440,
         None,
-        FunctionCall(
-            "my_time",
-            "toDateTime",
-            (
-                multiply(
-                    FunctionCall(
-                        None,
-                        "intDiv",
-                        (
-                            FunctionCall(
-                                None,
-                                "toUInt32",
-                                (Column(None, None, "finish_ts"),),
-                            ),
-                            Literal(None, 1440),
-                        ),
-                    ),
-                    Literal(None, 1440),
-                ),
-                Literal(None, "Universal"),
-            ),
-        ),
+        _TIME_FN_1440,
         None,
         "(toDateTime(multiply(intDiv(toUInt32(finish_ts), 1440), 1440), 'Universal') AS my_time)",
         "",
@@ -162,6 +148,16 @@ tests = [
 ]
 
 
+@pytest.fixture(scope="module")
+def timeseries_processor() -> TimeSeriesProcessor:
+    # The processor holds no per-query state, so one instance can serve every case.
+    return next(
+        processor
+        for processor in TransactionsEntity().get_query_processors()
+        if isinstance(processor, TimeSeriesProcessor)
+    )
+
+
 @pytest.mark.parametrize(
     "granularity, condition, exp_column, exp_condition, formatted_column, formatted_condition",
     tests,
@@ -173,38 +169,25 @@ def test_timeseries_format_expressions(
     exp_condition: Optional[FunctionCall],
     formatted_column: str,
     formatted_condition: str,
+    timeseries_processor: TimeSeriesProcessor,
 ) -> None:
     unprocessed = Query(
         QueryEntity(EntityKey.EVENTS, ColumnSet([])),
         selected_columns=[
-            SelectedExpression(
-                "transaction.duration", Column("transaction.duration", None, "duration")
-            ),
-            SelectedExpression("my_time", Column("my_time", None, "time")),
+            SelectedExpression("transaction.duration", _DUR_COL),
+            SelectedExpression("my_time", _TIME_COL),
         ],
         condition=condition,
-        groupby=[Column("my_time", None, "time")],
+        groupby=[_TIME_COL],
         granularity=granularity,
     )
-    expected = Query(
-        QueryEntity(EntityKey.EVENTS, ColumnSet([])),
-        selected_columns=[
-            SelectedExpression(
-                "transaction.duration", Column("transaction.duration", None, "duration")
-            ),
-            SelectedExpression(exp_column.alias, exp_column),
-        ],
-        condition=exp_condition,
-    )
+    timeseries_processor.process_query(unprocessed, HTTPQuerySettings())
 
-    entity = TransactionsEntity()
-    processors = entity.get_query_processors()
-    for processor in processors:
-        if isinstance(processor, TimeSeriesProcessor):
-            processor.process_query(unprocessed, HTTPQuerySettings())
-
-    assert expected.get_selected_columns() == unprocessed.get_selected_columns()
-    assert expected.get_condition() == unprocessed.get_condition()
+    assert unprocessed.get_selected_columns() == [
+        SelectedExpression("transaction.duration", _DUR_COL),
+        SelectedExpression(exp_column.alias, exp_column),
+    ]
+    assert unprocessed.get_condition() == exp_condition
 
     ret = unprocessed.get_selected_columns()[1].expression.accept(
         ClickhouseExpressionFormatter()
@@ -219,24 +202,41 @@ def test_timeseries_format_expressions(
     assert extract_granularity_from_query(unprocessed, "finish_ts") == granularity
 
 
-def test_invalid_datetime() -> None:
+@pytest.mark.parametrize(
+    "groupby_expression, granularity",
+    [
+        pytest.param(_time_fn("toStartOfMinute"), 60, id="toStartOfMinute"),
+        pytest.param(_time_fn("toStartOfHour"), 3600, id="toStartOfHour"),
+        pytest.param(_time_fn("toStartOfDay"), 86400, id="toStartOfDay"),
+        pytest.param(_time_fn("toDate"), 86400, id="toDate"),
+        pytest.param(_TIME_FN_1440, 1440, id="custom granularity"),
+        pytest.param(_FINISH_TS, None, id="not grouped by time"),
+    ],
+)
+def test_extract_granularity(
+    groupby_expression: Expression, granularity: Optional[int]
+) -> None:
+    query = Query(
+        QueryEntity(EntityKey.EVENTS, ColumnSet([])),
+        selected_columns=[SelectedExpression("my_time", groupby_expression)],
+        groupby=[groupby_expression],
+    )
+
+    assert extract_granularity_from_query(query, "finish_ts") == granularity
+
+
+def test_invalid_datetime(timeseries_processor: TimeSeriesProcessor) -> None:
     unprocessed = Query(
         QueryEntity(EntityKey.EVENTS, ColumnSet([])),
         selected_columns=[
-            SelectedExpression(
-                "transaction.duration", Column("transaction.duration", None, "duration")
-            ),
+            SelectedExpression("transaction.duration", _DUR_COL),
         ],
         condition=binary_condition(
             ConditionFunctions.EQ,
-            Column("my_time", None, "time"),
+            _TIME_COL,
             Literal(None, ""),
         ),
     )
 
-    entity = TransactionsEntity()
-    processors = entity.get_query_processors()
-    for processor in processors:
-        if isinstance(processor, TimeSeriesProcessor):
-            with pytest.raises(InvalidQueryException):
-                processor.process_query(unprocessed, HTTPQuerySettings())
+    with pytest.raises(InvalidQueryException):
+        timeseries_processor.process_query(unprocessed, HTTPQuerySettings())
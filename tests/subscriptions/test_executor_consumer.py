@@ -32,6 +32,7 @@ from snuba.subscriptions.data import (
     SubscriptionWithMetadata,
 )
 from snuba.subscriptions.executor_consumer import (
+    JOIN_RETRY_BACKOFF_SEC,
     ExecuteQuery,
     ProduceResult,
     build_executor_consumer,
@@ -244,6 +245,102 @@ def test_execute_query_strategy() -> None:
     strategy.join()
 
 
+def test_execute_query_strategy_next_step_rejected() -> None:
+    next_step = mock.Mock()
+    next_step.submit.side_effect = [MessageRejected(), None]
+
+    strategy = ExecuteQuery(
+        dataset=get_dataset("events"),
+        entity_names=["events"],
+        max_concurrent_queries=2,
+        stale_threshold_seconds=None,
+        metrics=TestingMetricsBackend(),
+        next_step=next_step,
+    )
+
+    make_message = generate_message(EntityKey.EVENTS)
+    message = next(make_message)
+
+    strategy.submit(message)
+
+    # The rejected result is retried on a later poll instead of being dropped
+    while next_step.submit.call_count < 2:
+        time.sleep(0.1)
+        strategy.poll()
+
+    assert next_step.submit.call_args_list[0] == next_step.submit.call_args_list[1]
+    assert next_step.submit.call_args[0][0].offset == message.offset
+
+    strategy.close()
+    strategy.join()
+    assert next_step.submit.call_count == 2
+
+
+def test_execute_query_strategy_next_step_rejected_on_join() -> None:
+    next_step = mock.Mock()
+    next_step.submit.side_effect = [MessageRejected(), MessageRejected(), None]
+
+    strategy = ExecuteQuery(
+        dataset=get_dataset("events"),
+        entity_names=["events"],
+        max_concurrent_queries=2,
+        stale_threshold_seconds=None,
+        metrics=TestingMetricsBackend(),
+        next_step=next_step,
+    )
+
+    make_message = generate_message(EntityKey.EVENTS)
+    message = next(make_message)
+
+    strategy.submit(message)
+
+    # The result is only flushed on join, which has to retry it until the next
+    # step accepts it
+    strategy.close()
+    strategy.join()
+
+    assert next_step.submit.call_count == 3
+    assert next_step.poll.call_count == 2
+    assert next_step.submit.call_args_list[0] == next_step.submit.call_args_list[2]
+    assert next_step.submit.call_args[0][0].offset == message.offset
+    next_step.close.assert_called_once()
+    next_step.join.assert_called_once()
+
+    # If the next step never accepts the result, the timeout bounds the retries
+    # and join backs off between them instead of spinning
+    next_step = mock.Mock()
+    next_step.submit.side_effect = MessageRejected()
+
+    strategy = ExecuteQuery(
+        dataset=get_dataset("events"),
+        entity_names=["events"],
+        max_concurrent_queries=2,
+        stale_threshold_seconds=None,
+        metrics=TestingMetricsBackend(),
+        next_step=next_step,
+    )
+    strategy.submit(next(make_message))
+
+    # Wait for the query to complete so the timeout is spent retrying
+    while next_step.submit.call_count < 1:
+        time.sleep(0.1)
+        strategy.poll()
+
+    timeout = 1.0
+    submit_count = next_step.submit.call_count
+    start = time.time()
+    strategy.close()
+    strategy.join(timeout)
+
+    assert time.time() - start < timeout + JOIN_RETRY_BACKOFF_SEC * 2
+    assert (
+        next_step.submit.call_count - submit_count
+        <= timeout / JOIN_RETRY_BACKOFF_SEC + 1
+    )
+    next_step.close.assert_called_once()
+    next_step.join.assert_called_once()
+
+
 def test_too_many_concurrent_queries() -> None:
     state.set_config("executor_queue_size_factor", 1)
 